@@ -1,31 +1,176 @@
 """
 Meeting Notes Summarizer using Ollama
-Requires: pip install flask flask-cors ollama
+Requires: pip install flask flask-cors ollama orjson gunicorn
+
+Production: gunicorn -w 4 -k gthread --threads 8 -b 127.0.0.1:5000 app:app
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, Response, stream_with_context
 from flask_cors import CORS
 import ollama
+import orjson
+import httpx
+import asyncio
+import hashlib
 import json
+import os
+import queue
 import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import repeat
 
 app = Flask(__name__)
+app.config['MAX_CONTENT_LENGTH'] = 2 * 1024 * 1024  # Reject bodies over 2MB before reading them
 CORS(app)
 
 # Configuration
-OLLAMA_MODEL = "llama3.2"  # or "mistral", "phi3", etc.
-
-def create_analysis_prompt(transcript):
-    """Create a structured prompt for the LLM"""
-    return f"""You are a meeting analysis assistant. Analyze this transcript and extract key information.
-
-Meeting Transcript:
-{transcript}
+# Small 4-bit quantized default: summarization is bound by weight bandwidth per decoded token
+OLLAMA_MODEL = os.getenv('OLLAMA_MODEL', 'llama3.2:3b-instruct-q4_K_M')  # or "mistral", "phi3", etc.
+OLLAMA_OPTIONS = {
+    'temperature': 0.1,  # Very low temperature for consistent structured output
+    'top_p': 0.9
+}
+OLLAMA_KEEP_ALIVE = '1h'  # Keep the model loaded between requests instead of Ollama's 5 minute default
+CHUNK_SIZE = 6000  # Characters per map-reduce window (~1.5k tokens at ~4 chars/token)
+CHUNK_OVERLAP = 400  # Characters shared between neighbouring windows
+CHUNK_WORKERS = 4  # Windows summarized in parallel
+MODELS_CACHE_TTL = 10  # Seconds to reuse the installed-model list between Ollama calls
+ANALYSIS_CACHE_SIZE = 256  # Number of analyses kept in memory for repeat transcripts
+MIN_TRANSCRIPT_WORDS = 30  # Shorter transcripts are answered without calling the LLM
+MAX_TRANSCRIPT_CHARS = 200_000  # Longer transcripts are rejected with 413
+PARSE_ERROR_SUMMARY = "Error: Could not parse the LLM response into structured format"
+
+# Markdown code fence markers (```json ... ```) around LLM output
+_FENCE_RE = re.compile(r'^```[a-zA-Z]*\n?|```$', re.MULTILINE)
+# Separator between bullet points the model concatenated into one string
+_BULLET_SPLIT = re.compile(r'\s+-\s+')
+
+# Exact-match cache of analyses, keyed on model, options and transcript
+_analysis_cache = OrderedDict()
+_analysis_cache_lock = threading.Lock()
+
+# At most MAX_CONCURRENT_CHATS chats are in flight at once per process; the rest
+# wait their turn. Ollama batches concurrent requests itself when OLLAMA_NUM_PARALLEL
+# allows it. Under gunicorn each worker has its own limit, so set OLLAMA_NUM_PARALLEL
+# to workers * MAX_CONCURRENT_CHATS
+MAX_CONCURRENT_CHATS = int(os.getenv('OLLAMA_MAX_CONCURRENT_CHATS', '8'))
+_STREAM_END = object()
+
+# All Ollama chats run as coroutines on one event loop thread instead of one
+# blocking OS thread each; the semaphore bounds how many are in flight
+_ollama_client = ollama.AsyncClient()
+_ollama_loop = asyncio.new_event_loop()
+threading.Thread(target=_ollama_loop.run_forever, name='ollama-loop', daemon=True).start()
+
+async def _create_semaphore():
+    # Created on the loop itself so it is bound to the right loop on Python < 3.10
+    return asyncio.Semaphore(MAX_CONCURRENT_CHATS)
+
+_ollama_semaphore = asyncio.run_coroutine_threadsafe(_create_semaphore(), _ollama_loop).result()
+
+async def _run_chat(messages, schema, out, cancelled):
+    """Stream one Ollama chat into a per-request queue until done or cancelled"""
+    try:
+        async with _ollama_semaphore:
+            if cancelled.is_set():
+                return
+            stream = await _ollama_client.chat(
+                model=OLLAMA_MODEL,
+                messages=messages,
+                stream=True,
+                format=schema,  # Structured output, requires Ollama 0.5+
+                options=OLLAMA_OPTIONS,
+                keep_alive=OLLAMA_KEEP_ALIVE
+            )
+            async for chunk in stream:
+                if cancelled.is_set():
+                    await stream.aclose()
+                    break
+                out.put(chunk)
+    except httpx.ConnectError as e:
+        # Streaming chats surface the raw httpx error; only non-streaming calls
+        # convert it, so map it here for the "Ollama not running" handling
+        out.put(ConnectionError(str(e)))
+    except Exception as e:
+        out.put(e)
+    finally:
+        out.put(_STREAM_END)
+
+def stream_chat(messages, schema):
+    """Start a chat on the Ollama event loop and yield its chunks as they arrive
+
+    schema is the JSON Schema the output is constrained to.
+    """
+    out = queue.Queue()
+    cancelled = threading.Event()
+    asyncio.run_coroutine_threadsafe(_run_chat(messages, schema, out, cancelled), _ollama_loop)
+    try:
+        while True:
+            item = out.get()
+            if item is _STREAM_END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Stop generating if the consumer stops early or the client disconnects
+        cancelled.set()
+
+def ojsonify(payload):
+    """jsonify() equivalent that serializes with orjson"""
+    return app.response_class(orjson.dumps(payload), mimetype='application/json')
+
+def analysis_cache_key(transcript):
+    """Hash everything that determines the model output for a transcript"""
+    payload = orjson.dumps({
+        'model': OLLAMA_MODEL,
+        'options': OLLAMA_OPTIONS,
+        'transcript': transcript
+    }, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(payload).hexdigest()
+
+def get_cached_analysis(key):
+    """Return a cached analysis and mark it as recently used, or None"""
+    with _analysis_cache_lock:
+        analysis = _analysis_cache.get(key)
+        if analysis is not None:
+            _analysis_cache.move_to_end(key)
+        return analysis
+
+def store_cached_analysis(key, analysis):
+    """Cache an analysis, evicting the least recently used entry when full"""
+    with _analysis_cache_lock:
+        _analysis_cache[key] = analysis
+        _analysis_cache.move_to_end(key)
+        while len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+            _analysis_cache.popitem(last=False)
+
+# JSON Schema passed to Ollama's structured output (format=...), so the model is
+# constrained to emit exactly this object instead of free-form JSON
+_STRING_LIST = {'type': 'array', 'items': {'type': 'string'}}
+ANALYSIS_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'meeting_summary': {'type': 'string'},
+        'participants': _STRING_LIST,
+        'key_decisions': _STRING_LIST,
+        'action_items': _STRING_LIST,
+        'discussion_points': _STRING_LIST
+    },
+    'required': ['meeting_summary', 'participants', 'key_decisions', 'action_items', 'discussion_points']
+}
+
+# Static instructions go in the system message so Ollama can reuse their KV cache
+# across requests; only the transcript in the user message changes per call
+SYSTEM_PROMPT = """You are a meeting analysis assistant. Analyze the meeting transcript sent by the user and extract key information.
 
 CRITICAL: Return ONLY valid JSON. No markdown, no explanations, no code blocks. Just the JSON object.
 
 Required JSON structure:
-{{
+{
     "meeting_summary": "2-3 sentence summary here",
     "participants": ["Name1", "Name2"],
     "key_decisions": [
@@ -40,7 +185,7 @@ Required JSON structure:
         "Discussion point 1",
         "Discussion point 2"
     ]
-}}
+}
 
 Rules:
 - Each array item must be a SEPARATE string, not concatenated
@@ -51,52 +196,124 @@ Rules:
 - List all participant names
 - Return ONLY the JSON object, nothing else"""
 
-def extract_json_from_response(response_text):
-    """Extract JSON from LLM response, handling various formats"""
+def create_analysis_prompt(transcript):
+    """Create the chat messages for the LLM"""
+    return [
+        {'role': 'system', 'content': SYSTEM_PROMPT},
+        {'role': 'user', 'content': f"Meeting Transcript:\n{transcript}"}
+    ]
+
+SUMMARY_SCHEMA = {
+    'type': 'object',
+    'properties': {'meeting_summary': {'type': 'string'}},
+    'required': ['meeting_summary']
+}
+
+SUMMARY_SYSTEM_PROMPT = """You are a meeting analysis assistant. The user sends, in order, summaries of consecutive sections of one long meeting. Combine them into a single summary of the whole meeting.
+
+CRITICAL: Return ONLY valid JSON. No markdown, no explanations, no code blocks. Just the JSON object.
+
+Required JSON structure:
+{
+    "meeting_summary": "2-3 sentence summary here"
+}"""
+
+def create_summary_prompt(section_summaries):
+    """Create the chat messages that condense section summaries into one summary"""
+    return [
+        {'role': 'system', 'content': SUMMARY_SYSTEM_PROMPT},
+        {'role': 'user', 'content': "Section summaries:\n" + section_summaries}
+    ]
+
+def _find_json(text):
+    """Return the first balanced {...} object in text, or None
+
+    Single linear pass tracking brace depth, ignoring braces inside strings.
+    """
+    start = text.find('{')
+    if start == -1:
+        return None
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+def _parse_json(response_text):
+    """Parse a malformed LLM response into a dict, or return None
+
+    Fallback for models or Ollama versions that ignore the schema and wrap the
+    JSON in markdown or prose.
+    """
 
     # Remove markdown code blocks if present
     cleaned = response_text.strip()
     if cleaned.startswith('```'):
-        # Remove code block markers
-        lines = cleaned.split('\n')
-        if lines[0].startswith('```'):
-            lines = lines[1:]
-        if lines and lines[-1].startswith('```'):
-            lines = lines[:-1]
-        cleaned = '\n'.join(lines)
+        cleaned = _FENCE_RE.sub('', cleaned).strip()
 
     # Try to find JSON object in the response
-    json_match = re.search(r'\{[\s\S]*\}', cleaned)
-    if json_match:
+    json_text = _find_json(cleaned)
+    if json_text:
         try:
-            parsed = json.loads(json_match.group())
-
-            # Ensure all required keys exist
-            required_keys = ['meeting_summary', 'participants', 'key_decisions', 'action_items', 'discussion_points']
-            for key in required_keys:
-                if key not in parsed:
-                    parsed[key] = [] if key != 'meeting_summary' else 'No summary available'
-
-            # Post-process to split concatenated items
-            for key in ['key_decisions', 'action_items', 'discussion_points']:
-                if key in parsed and parsed[key]:
-                    cleaned_items = []
-                    for item in parsed[key]:
-                        if isinstance(item, str):
-                            # If item contains multiple bullet points, split them
-                            if ' - ' in item and item.count(' - ') > 2:
-                                split_items = [s.strip() for s in item.split(' - ') if s.strip()]
-                                cleaned_items.extend(split_items)
-                            else:
-                                cleaned_items.append(item.strip())
-                        else:
-                            cleaned_items.append(str(item))
-                    parsed[key] = cleaned_items
-
-            return parsed
-        except json.JSONDecodeError as e:
+            return orjson.loads(json_text)
+        except (json.JSONDecodeError, orjson.JSONDecodeError) as e:
             print(f"JSON parsing error: {e}")
-            print(f"Attempted to parse: {json_match.group()[:200]}")
+            print(f"Attempted to parse: {json_text[:200]}")
+    return None
+
+def _ensure_keys(parsed):
+    """Fill in missing keys and split concatenated items in a parsed analysis"""
+
+    # Ensure all required keys exist
+    required_keys = ['meeting_summary', 'participants', 'key_decisions', 'action_items', 'discussion_points']
+    for key in required_keys:
+        if key not in parsed:
+            parsed[key] = [] if key != 'meeting_summary' else 'No summary available'
+
+    # Post-process to split concatenated items
+    for key in ['key_decisions', 'action_items', 'discussion_points']:
+        if key in parsed and parsed[key]:
+            cleaned_items = []
+            for item in parsed[key]:
+                if isinstance(item, str):
+                    # If item contains multiple bullet points, split them
+                    parts = _BULLET_SPLIT.split(item)
+                    if len(parts) > 3:
+                        cleaned_items.extend(p.strip() for p in parts if p.strip())
+                    else:
+                        cleaned_items.append(item.strip())
+                else:
+                    cleaned_items.append(str(item))
+            parsed[key] = cleaned_items
+
+    return parsed
+
+def extract_json_from_response(response_text):
+    """Extract JSON from LLM response, handling various formats
+
+    Only needed when the response is not already valid JSON.
+    """
+
+    parsed = _parse_json(response_text)
+    if parsed is not None:
+        return _ensure_keys(parsed)
 
     # Fallback: create structured response from text
     return {
@@ -104,34 +321,160 @@ def extract_json_from_response(response_text):
         "action_items": ["Try analyzing again or use a different model"],
         "discussion_points": ["Raw response: " + response_text[:300] + "..."],
         "participants": [],
-        "meeting_summary": "Error: Could not parse the LLM response into structured format"
+        "meeting_summary": PARSE_ERROR_SUMMARY
     }
 
+def _chunk(text, size=CHUNK_SIZE, overlap=CHUNK_OVERLAP):
+    """Split text into overlapping windows, preferring line or word boundaries
+
+    A tail shorter than size // 2 is folded into the last window rather than
+    becoming a window that is mostly overlap, so the last window may be up to
+    1.5 * size long.
+    """
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if len(text) - end < size // 2:
+            end = len(text)
+        else:
+            cut = text.rfind('\n', start + size // 2, end)
+            if cut == -1:
+                cut = text.rfind(' ', start + size // 2, end)
+            if cut != -1:
+                end = cut
+        chunks.append(text[start:end])
+        if end == len(text):
+            break
+        start = end - overlap
+    return chunks
+
+def _complete_json(messages, schema, cancelled):
+    """Run a chat to completion without streaming and parse its JSON, or return None"""
+    chunks = []
+    stream = stream_chat(messages, schema)
+    try:
+        for chunk in stream:
+            if cancelled.is_set():
+                return None
+            chunks.append(chunk['message']['content'])
+    finally:
+        stream.close()  # Frees the Ollama worker if we stopped early
+
+    response_text = "".join(chunks)
+    try:
+        parsed = orjson.loads(response_text)
+    except orjson.JSONDecodeError:
+        parsed = _parse_json(response_text)
+    return parsed if isinstance(parsed, dict) else None
+
+def summarize_chunk(text, cancelled):
+    """Analyze one transcript window, returning partial results or None if unparseable"""
+    if cancelled.is_set():
+        return None
+    parsed = _complete_json(create_analysis_prompt(text), ANALYSIS_SCHEMA, cancelled)
+    return _ensure_keys(parsed) if parsed is not None else None
+
+def summarize_notes(text, cancelled):
+    """Condense one window of section summaries into a single summary, or None"""
+    if cancelled.is_set():
+        return None
+    parsed = _complete_json(create_summary_prompt(text), SUMMARY_SCHEMA, cancelled)
+    summary = parsed.get('meeting_summary') if parsed is not None else None
+    return summary if isinstance(summary, str) and summary.strip() else None
+
+def _unique(items):
+    """De-duplicate strings case-insensitively, keeping first-seen order"""
+    seen = set()
+    result = []
+    for item in items:
+        key = item.strip().lower()
+        if key and key not in seen:
+            seen.add(key)
+            result.append(item.strip())
+    return result
+
+def _bullets(summaries):
+    """Format summaries as a bulleted list of notes"""
+    return "\n".join(f"- {summary}" for summary in summaries)
+
+def summarize_long_transcript(windows):
+    """Map-reduce the windows of a long transcript
+
+    Each window is analyzed in parallel. The list fields are merged directly;
+    the section summaries are condensed again, window by window, until they
+    fit in CHUNK_SIZE.
+
+    This is a generator: it yields an SSE progress frame as each window
+    finishes, so a client that has disconnected is noticed between windows
+    and the remaining ones are stopped. It returns (merged lists, section
+    summary notes) for the final summary pass, or None if no window could be
+    parsed.
+    """
+    cancelled = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=CHUNK_WORKERS)
+    futures = [executor.submit(summarize_chunk, window, cancelled) for window in windows]
+    try:
+        for completed, future in enumerate(as_completed(futures), 1):
+            future.result()  # Surface Ollama errors as soon as they happen
+            yield sse_event({'stage': 'chunking', 'completed': completed, 'total': len(windows)})
+
+        partials = [future.result() for future in futures if future.result() is not None]
+        if not partials:
+            return None
+
+        merged = {}
+        for key in ['participants', 'key_decisions', 'action_items', 'discussion_points']:
+            merged[key] = _unique(
+                str(item) for p in partials for item in (p.get(key) or [])
+            )
+
+        notes = _bullets(str(p['meeting_summary']) for p in partials)
+        while len(notes) > CHUNK_SIZE:
+            note_windows = _chunk(notes)
+            summaries = [summary for summary in executor.map(summarize_notes, note_windows, repeat(cancelled))
+                         if summary is not None]
+            condensed = _bullets(summaries)
+            # Stop if a round fails to shrink the notes rather than looping forever
+            if not summaries or len(condensed) >= len(notes):
+                break
+            notes = condensed
+
+        return merged, notes
+    finally:
+        # Stop outstanding windows on error or client disconnect (no-op once all are done)
+        cancelled.set()
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+_models_cache = {'ts': 0, 'data': None}
+_models_cache_lock = threading.Lock()
+
+def _extract_names(models_list):
+    """Extract model names from the entries of an ollama.list() response"""
+    return [model['model'] for model in models_list if model['model']]
+
+def _get_models(ttl=MODELS_CACHE_TTL):
+    """Return installed model names, calling ollama.list() at most once per ttl seconds"""
+    with _models_cache_lock:
+        if _models_cache['data'] is not None and time.monotonic() - _models_cache['ts'] <= ttl:
+            return _models_cache['data']
+
+        # ListResponse and its Model entries are subscriptable like dicts
+        models_response = ollama.list()
+
+        _models_cache['data'] = _extract_names(models_response['models'])
+        _models_cache['ts'] = time.monotonic()
+        return _models_cache['data']
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Check if Ollama is running and model is available"""
     try:
-        # Try to list models with better error handling
-        models_response = ollama.list()
+        model_names = _get_models()
 
-        # Handle different response formats
-        if isinstance(models_response, dict):
-            models_list = models_response.get('models', [])
-        else:
-            models_list = []
-
-        # Extract model names safely
-        model_names = []
-        for model in models_list:
-            if isinstance(model, dict):
-                # Try different possible keys
-                name = model.get('name') or model.get('model') or model.get('id')
-                if name:
-                    model_names.append(name)
-            elif isinstance(model, str):
-                model_names.append(model)
-
-        return jsonify({
+        return ojsonify({
             'status': 'healthy',
             'ollama_running': True,
             'available_models': model_names,
@@ -139,98 +482,183 @@ def health_check():
             'models_count': len(model_names)
         })
     except ConnectionError as e:
-        return jsonify({
+        return ojsonify({
             'status': 'error',
             'ollama_running': False,
             'error': 'Cannot connect to Ollama. Make sure Ollama is running (ollama serve)',
             'details': str(e)
         }), 500
     except Exception as e:
-        return jsonify({
+        return ojsonify({
             'status': 'error',
             'ollama_running': False,
             'error': f'Ollama error: {str(e)}',
             'suggestion': 'Run: ollama list (to check if Ollama is working)'
         }), 500
 
+def sse_event(payload):
+    """Format a payload as a Server-Sent Events data frame"""
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze_meeting():
-    """Analyze meeting transcript using Ollama"""
+    """Analyze meeting transcript using Ollama, streaming tokens as Server-Sent Events"""
+    # Parse the body once with orjson and don't keep a cached copy of the raw bytes
     try:
-        data = request.json
-        transcript = data.get('transcript', '')
-
-        if not transcript.strip():
-            return jsonify({'error': 'Empty transcript'}), 400
-
-        # Create prompt
-        prompt = create_analysis_prompt(transcript)
-
-        # Call Ollama with stricter parameters for JSON output
-        response = ollama.chat(
-            model=OLLAMA_MODEL,
-            messages=[{
-                'role': 'user',
-                'content': prompt
-            }],
-            format='json',  # Force JSON output mode
-            options={
-                'temperature': 0.1,  # Very low temperature for consistent structured output
-                'top_p': 0.9
-            }
-        )
-
-        # Extract response
-        response_text = response['message']['content']
-
-        # Parse JSON from response
-        analysis = extract_json_from_response(response_text)
-
-        return jsonify({
+        data = orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError:
+        return ojsonify({'error': 'Request body must be JSON'}), 400
+    if not isinstance(data, dict):
+        return ojsonify({'error': 'Request body must be a JSON object'}), 400
+    transcript = data.get('transcript', '')
+    if not isinstance(transcript, str):
+        return ojsonify({'error': 'transcript must be a string'}), 400
+
+    if not transcript.strip():
+        return ojsonify({'error': 'Empty transcript'}), 400
+
+    if len(transcript) > MAX_TRANSCRIPT_CHARS:
+        return ojsonify({
+            'error': f'Transcript too long (max {MAX_TRANSCRIPT_CHARS} characters)'
+        }), 413
+
+    # Nothing useful to extract from a few words; skip the multi-second LLM call
+    if len(transcript.split()) < MIN_TRANSCRIPT_WORDS:
+        return ojsonify({
             'success': True,
-            'analysis': analysis,
-            'model_used': OLLAMA_MODEL,
-            'raw_response': response_text  # For debugging
+            'skipped': True,
+            'analysis': {
+                'meeting_summary': 'Transcript too short to analyze',
+                'participants': [],
+                'key_decisions': [],
+                'action_items': [],
+                'discussion_points': []
+            }
         })
 
-    except ConnectionError as e:
-        return jsonify({
-            'error': 'Cannot connect to Ollama',
-            'suggestion': 'Make sure Ollama is running: ollama serve',
-            'details': str(e)
-        }), 500
-    except Exception as e:
-        return jsonify({
-            'error': f'Error: {str(e)}',
-            'suggestion': f'Make sure model is available: ollama pull {OLLAMA_MODEL}'
-        }), 500
+    # The raw model output roughly doubles the payload, so only send it on request
+    include_raw = request.args.get('debug') == '1'
+
+    # Identical transcripts give near-identical output at this temperature
+    cache_key = analysis_cache_key(transcript)
+
+    def generate():
+        # Debug requests need the raw model output, so always generate afresh
+        cached = None if include_raw else get_cached_analysis(cache_key)
+        if cached is not None:
+            yield sse_event({
+                'done': True,
+                'success': True,
+                'analysis': cached,
+                'model_used': OLLAMA_MODEL,
+                'cached': True
+            })
+            return
+
+        try:
+            # Long transcripts are condensed section by section before the final pass
+            windows = _chunk(transcript)
+            merged = None
+            if len(windows) > 1:
+                yield sse_event({'stage': 'chunking', 'completed': 0, 'total': len(windows)})
+                reduced = yield from summarize_long_transcript(windows)
+                if reduced is None:
+                    yield sse_event({
+                        'error': 'Could not parse the LLM response for any section of the transcript',
+                        'suggestion': 'Try analyzing again or use a different model'
+                    })
+                    return
+                # The final pass only writes the summary; the lists are already merged
+                merged, notes = reduced
+                messages, schema = create_summary_prompt(notes), SUMMARY_SCHEMA
+            else:
+                messages, schema = create_analysis_prompt(transcript), ANALYSIS_SCHEMA
+
+            # Call Ollama on the shared event loop
+            stream = stream_chat(messages, schema)
+
+            # Forward each token as it arrives; keep a list so the final join is linear
+            chunks = []
+            analysis = None
+            for chunk in stream:
+                delta = chunk['message']['content']
+                if not delta:
+                    continue
+                chunks.append(delta)
+                yield sse_event({'delta': delta})
+
+                # The object can only be complete once a closing bracket arrives;
+                # stop as soon as it parses so trailing whitespace isn't generated
+                if delta.rstrip().endswith(('}', ']')):
+                    try:
+                        parsed = orjson.loads("".join(chunks))
+                    except orjson.JSONDecodeError:
+                        continue
+                    if isinstance(parsed, dict):
+                        # Structured output is already valid JSON, reuse it as is
+                        analysis = _ensure_keys(parsed)
+                        break
+            stream.close()  # Frees the Ollama worker if we stopped early
+
+            response_text = "".join(chunks)
+            if analysis is None:
+                # Fall back to the heuristic parser only when the fast path failed
+                analysis = extract_json_from_response(response_text)
+
+            if merged is not None:
+                if analysis.get('meeting_summary') == PARSE_ERROR_SUMMARY:
+                    # Keep the merged lists; the condensed section notes stand in for the summary
+                    analysis = _ensure_keys({'meeting_summary': notes})
+                analysis.update(merged)
+
+            # Don't cache parse failures so a retry gets a fresh generation
+            if analysis.get('meeting_summary') != PARSE_ERROR_SUMMARY:
+                store_cached_analysis(cache_key, analysis)
+
+            payload = {
+                'done': True,
+                'success': True,
+                'analysis': analysis,
+                'model_used': OLLAMA_MODEL
+            }
+            if include_raw:
+                payload['raw_response'] = response_text  # For debugging
+            yield sse_event(payload)
+
+        except ConnectionError as e:
+            yield sse_event({
+                'error': 'Cannot connect to Ollama',
+                'suggestion': 'Make sure Ollama is running: ollama serve',
+                'details': str(e)
+            })
+        except Exception as e:
+            yield sse_event({
+                'error': f'Error: {str(e)}',
+                'suggestion': f'Make sure model is available: ollama pull {OLLAMA_MODEL}'
+            })
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.errorhandler(413)
+def request_too_large(e):
+    """Return oversize-body rejections as JSON like the rest of the API"""
+    return ojsonify({
+        'error': f"Request body too large (max {app.config['MAX_CONTENT_LENGTH']} bytes)"
+    }), 413
 
 @app.route('/api/models', methods=['GET'])
 def list_models():
     """List available Ollama models"""
     try:
-        models_response = ollama.list()
-
-        # Handle response safely
-        if isinstance(models_response, dict):
-            models_list = models_response.get('models', [])
-        else:
-            models_list = []
-
-        model_names = []
-        for model in models_list:
-            if isinstance(model, dict):
-                name = model.get('name') or model.get('model') or model.get('id')
-                if name:
-                    model_names.append(name)
-            elif isinstance(model, str):
-                model_names.append(model)
-
-        return jsonify({
-            'models': model_names
+        return ojsonify({
+            'models': _get_models()
         })
     except Exception as e:
-        return jsonify({
+        return ojsonify({
             'error': str(e),
             'models': []
         }), 500
@@ -238,7 +666,7 @@ def list_models():
 @app.route('/', methods=['GET'])
 def home():
     """Home endpoint with API info"""
-    return jsonify({
+    return ojsonify({
         'message': 'Meeting Notes Summarizer API',
         'endpoints': {
             '/api/health': 'Check Ollama connection status',
@@ -248,6 +676,19 @@ def home():
         'instructions': 'Open index.html in your browser to use the application'
     })
 
+def warm_up_model():
+    """Load the model into Ollama with a one-token chat so the first analysis doesn't pay for it"""
+    try:
+        ollama.chat(
+            model=OLLAMA_MODEL,
+            messages=[{'role': 'user', 'content': 'ok'}],
+            options={'num_predict': 1},
+            keep_alive=OLLAMA_KEEP_ALIVE
+        )
+        print(f"Model {OLLAMA_MODEL} loaded")
+    except Exception as e:
+        print(f"Could not warm up {OLLAMA_MODEL}: {e}")
+
 if __name__ == '__main__':
     print("=" * 60)
     print("Meeting Notes Summarizer - Ollama Backend")
@@ -260,6 +701,8 @@ if __name__ == '__main__':
     print("  4. If not running: ollama serve")
     print("\nStarting Flask server...")
     print("API will be available at: http://127.0.0.1:5000")
+    print("For production use: gunicorn -w 4 -k gthread --threads 8 -b 127.0.0.1:5000 app:app")
     print("=" * 60)
 
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    warm_up_model()
+    app.run(port=5000, threaded=True)
\ No newline at end of file
@@ -0,0 +1,13 @@
+"""
+Gunicorn settings, loaded automatically when gunicorn is started from this directory
+"""
+
+import threading
+
+
+def post_worker_init(worker):
+    """Load the model into Ollama once the worker has imported the app"""
+    from app import warm_up_model
+
+    # In the background so a slow model load can't trip the worker boot timeout
+    threading.Thread(target=warm_up_model, name='ollama-warm-up', daemon=True).start()